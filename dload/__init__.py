@@ -5,22 +5,47 @@ A python library to simplify download tasks while retaining compatibility
 with Python 3.6.
 """
 
+import codecs
+import hashlib
 import io
+import json as _json
+import mmap
 import os
 import re
 import sys
+import tarfile
+import tempfile
+import threading
 import time
 import zipfile
 from cgi import parse_header
+from collections import deque
 from contextlib import closing
 from shutil import copyfileobj
-from typing import Iterable, List, Optional
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from urllib import request
 from urllib.parse import unquote, urlparse
 
 import requests
+from urllib3.exceptions import DecodeError, ProtocolError, ReadTimeoutError
 
 DEFAULT_TIMEOUT = 30
+SNIFF_SIZE = 65536
+DEFAULT_BRANCH_TTL = 300.0
+ARCHIVE_CACHE_TTL = 600.0
+GITHUB_API_URL = "https://api.github.com"
+MIN_CHUNK_SIZE = 16384
+MAX_CHUNK_SIZE = 4 * 1024 * 1024
+THROTTLE_STATUS = (429, 503)
+MAX_AUTO_THREADS = 32
+
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
 
 
 def check_installation(rv: str = "36") -> bool:
@@ -110,11 +135,67 @@ def _header_filename(content_disposition: Optional[str]) -> str:
     return os.path.basename(filename)
 
 
+def _check_size(size: int, max_size: int) -> None:
+    """Raise ``ValueError`` when ``size`` exceeds a positive ``max_size``."""
+
+    if max_size > 0 and size > max_size:
+        raise ValueError(f"Response body exceeds max_size ({size} > {max_size} bytes)")
+
+
+def _spooled_content(
+    response: requests.Response,
+    chunk_size: int,
+    spool_threshold: int,
+    max_size: int,
+) -> Union[bytes, mmap.mmap]:
+    """
+    Read a streamed response body, spilling to an anonymous temp file when large.
+
+    Bodies up to ``spool_threshold`` bytes are returned as ``bytes``. Larger bodies
+    are written to a temporary file and returned as a read-only ``mmap`` of that
+    file, keeping resident memory bounded.
+    """
+
+    content_length = response.headers.get("content-length", "")
+    if content_length.isdigit():
+        _check_size(int(content_length), max_size)
+
+    buffer = io.BytesIO()
+    spool = None
+    downloaded = 0
+    try:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            if not chunk:
+                continue
+            downloaded += len(chunk)
+            _check_size(downloaded, max_size)
+            if spool is None and spool_threshold > 0 and downloaded > spool_threshold:
+                spool = tempfile.TemporaryFile()
+                spool.write(buffer.getbuffer())
+                buffer = io.BytesIO()
+            if spool is None:
+                buffer.write(chunk)
+            else:
+                spool.write(chunk)
+
+        if spool is None:
+            return buffer.getvalue()
+
+        spool.flush()
+        return mmap.mmap(spool.fileno(), 0, access=mmap.ACCESS_READ)
+    finally:
+        if spool is not None:
+            spool.close()
+
+
 def bytes(
     url: str,
     timeout: int = DEFAULT_TIMEOUT,
     raise_on_error: bool = True,
-) -> bytes:
+    spool_threshold: int = 0,
+    max_size: int = 0,
+    chunk_size: int = 65536,
+) -> Union[bytes, mmap.mmap]:
     """
     Return the remote file as bytes.
 
@@ -122,15 +203,30 @@ def bytes(
     :param timeout: Optional request timeout in seconds.
     :param raise_on_error: If ``True`` re-raises download errors; otherwise returns
         ``b""`` on failure.
+    :param spool_threshold: When positive, bodies larger than this many bytes are
+        spooled to an anonymous temporary file and returned as a read-only
+        ``mmap.mmap``, which supports ``len()`` and slicing. Close it, or use it as
+        a context manager, to release the mapping promptly. Smaller bodies are
+        still returned as ``bytes``. Bodies kept in memory are joined into a single
+        ``bytes`` object, so their peak usage is about twice their size.
+    :param max_size: When positive, abort with ``ValueError`` as soon as the body
+        (or its declared ``Content-Length``) exceeds this many bytes.
+    :param chunk_size: Size (in bytes) of streaming chunks read when
+        ``spool_threshold`` or ``max_size`` is set.
     :return: Raw response content, or ``b""`` on failure when ``raise_on_error`` is
         ``False``.
     """
 
     try:
-        response = requests.get(url, timeout=timeout)
-        response.raise_for_status()
-        return response.content
-    except (requests.RequestException, ValueError):
+        if spool_threshold <= 0 and max_size <= 0:
+            response = requests.get(url, timeout=timeout)
+            response.raise_for_status()
+            return response.content
+
+        with requests.get(url, stream=True, timeout=timeout) as response:
+            response.raise_for_status()
+            return _spooled_content(response, chunk_size, spool_threshold, max_size)
+    except (OSError, requests.RequestException, ValueError):
         if raise_on_error:
             raise
         return b""
@@ -144,6 +240,61 @@ def rand_fn() -> str:
     return str(int(time.time()))[:5]
 
 
+def _write_response(
+    response: requests.Response,
+    destination: str,
+    chunk_size: int,
+    adaptive: bool = False,
+) -> Tuple[int, int]:
+    """
+    Stream a response body into ``destination``.
+
+    When ``adaptive`` is ``True`` the read size starts at ``chunk_size`` and doubles
+    while full reads complete almost instantly, or halves when a single read stalls,
+    staying within ``MIN_CHUNK_SIZE`` and ``MAX_CHUNK_SIZE``. A body shorter than its
+    declared ``Content-Length`` raises ``requests.RequestException``.
+
+    :return: Number of bytes written and the final chunk size.
+    """
+
+    written = 0
+    with open(destination, "wb") as file_handle:
+        if not adaptive:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                if chunk:
+                    file_handle.write(chunk)
+                    written += len(chunk)
+        else:
+            chunk_size = min(max(chunk_size, MIN_CHUNK_SIZE), MAX_CHUNK_SIZE)
+            while True:
+                start = time.perf_counter()
+                try:
+                    chunk = response.raw.read(chunk_size, decode_content=True)
+                except ProtocolError as error:
+                    raise requests.exceptions.ChunkedEncodingError(error)
+                except DecodeError as error:
+                    raise requests.exceptions.ContentDecodingError(error)
+                except ReadTimeoutError as error:
+                    raise requests.exceptions.ConnectionError(error)
+                elapsed = time.perf_counter() - start
+                if not chunk:
+                    break
+                file_handle.write(chunk)
+                written += len(chunk)
+                if len(chunk) >= chunk_size and elapsed < 0.005:
+                    chunk_size = min(chunk_size * 2, MAX_CHUNK_SIZE)
+                elif elapsed > 0.25:
+                    chunk_size = max(chunk_size // 2, MIN_CHUNK_SIZE)
+
+    content_length = response.headers.get("content-length", "")
+    received = response.raw.tell()
+    if content_length.isdigit() and received < int(content_length):
+        raise requests.RequestException(
+            f"Incomplete download: received {received} of {content_length} bytes"
+        )
+    return written, chunk_size
+
+
 def save(
     url: str,
     path: str = "",
@@ -161,7 +312,8 @@ def save(
     :param overwrite: If ``True`` the local file will be overwritten; ``False``
         will skip the download if the file already exists.
     :param timeout: Optional request timeout in seconds.
-    :param chunk_size: Optional size (in bytes) of streaming chunks written to disk.
+    :param chunk_size: Optional size (in bytes) of streaming chunks written to disk;
+        ``0`` tunes the size automatically from observed read times.
     :param raise_on_error: If ``True`` re-raises download errors instead of returning
         an empty string.
     :return: The full path of the downloaded file or an empty string when
@@ -169,8 +321,6 @@ def save(
     """
 
     try:
-        namespace = _get_caller_namespace()
-        base_path = _get_caller_dir(namespace)
         provided_path = path.strip()
         destination: Optional[str] = None
 
@@ -183,6 +333,8 @@ def save(
             response.raise_for_status()
 
             if not destination:
+                # Frame inspection is only needed when the path comes from the caller.
+                base_path = _get_caller_dir(_get_caller_namespace())
                 header_filename = _header_filename(
                     response.headers.get("content-disposition")
                 )
@@ -192,10 +344,7 @@ def save(
                     return destination
 
             os.makedirs(os.path.dirname(destination), exist_ok=True)
-            with open(destination, "wb") as file_handle:
-                for chunk in response.iter_content(chunk_size=chunk_size):
-                    if chunk:
-                        file_handle.write(chunk)
+            _write_response(response, destination, chunk_size, adaptive=chunk_size <= 0)
         return destination
     except (OSError, requests.RequestException, ValueError):
         if raise_on_error:
@@ -203,36 +352,173 @@ def save(
         return ""
 
 
+def _sniff_encoding(prefix: "bytes") -> str:
+    """Guess a text encoding from a bounded body prefix, preferring a BOM or UTF-8."""
+
+    for bom, encoding in _BOMS:
+        if prefix.startswith(bom):
+            return encoding
+
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(prefix, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+
+    detected = requests.compat.chardet.detect(prefix) if requests.compat.chardet else None
+    if detected and detected.get("encoding"):
+        return detected["encoding"]
+    return "utf-8"
+
+
+def _iter_decoded(
+    response: requests.Response,
+    encoding: str,
+    chunk_size: int,
+) -> Iterator[str]:
+    """
+    Incrementally decode a streamed response body.
+
+    ``encoding`` wins when given, then the charset declared by the server. Otherwise
+    the encoding is sniffed from at most ``SNIFF_SIZE`` leading bytes instead of the
+    whole body.
+    """
+
+    if not encoding:
+        try:
+            _, params = parse_header(response.headers.get("content-type", ""))
+        except (ValueError, TypeError):
+            params = {}
+        encoding = params.get("charset", "").strip("\"' ")
+    if encoding:
+        try:
+            codecs.lookup(encoding)
+        except LookupError:
+            encoding = ""
+
+    chunks = response.iter_content(chunk_size=chunk_size)
+    pending = []
+    if not encoding:
+        size = 0
+        for chunk in chunks:
+            pending.append(chunk)
+            size += len(chunk)
+            if size >= SNIFF_SIZE:
+                break
+        encoding = _sniff_encoding(b"".join(pending)[:SNIFF_SIZE])
+
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    for chunk in pending:
+        decoded = decoder.decode(chunk)
+        if decoded:
+            yield decoded
+    for chunk in chunks:
+        decoded = decoder.decode(chunk)
+        if decoded:
+            yield decoded
+    decoded = decoder.decode(b"", final=True)
+    if decoded:
+        yield decoded
+
+
 def text(
     url: str,
     encoding: str = "",
     timeout: int = DEFAULT_TIMEOUT,
     raise_on_error: bool = True,
+    chunk_size: int = 65536,
 ) -> str:
     """
     Return the remote file content as a string.
 
     :param url: URL to retrieve.
-    :param encoding: Optional character encoding.
+    :param encoding: Optional character encoding. When empty, the server-declared
+        charset is used, then a BOM or a sniff of the first ``SNIFF_SIZE`` bytes.
     :param timeout: Optional request timeout in seconds.
     :param raise_on_error: If ``True`` re-raises download errors; otherwise returns
         an empty string on failure.
+    :param chunk_size: Size (in bytes) of streaming chunks decoded at a time.
     :return: Response text or an empty string on failure when ``raise_on_error`` is
         ``False``.
     """
 
     try:
-        response = requests.get(url, timeout=timeout)
-        response.raise_for_status()
-        if encoding:
-            response.encoding = encoding
-        return response.text
+        with requests.get(url, stream=True, timeout=timeout) as response:
+            response.raise_for_status()
+            return "".join(_iter_decoded(response, encoding, chunk_size))
     except (requests.RequestException, ValueError):
         if raise_on_error:
             raise
         return ""
 
 
+def iter_lines(
+    url: str,
+    encoding: str = "",
+    timeout: int = DEFAULT_TIMEOUT,
+    raise_on_error: bool = True,
+    chunk_size: int = 65536,
+) -> Iterator[str]:
+    """
+    Yield the remote file line by line without loading the whole body.
+
+    :param url: URL to retrieve.
+    :param encoding: Optional character encoding, resolved as in :func:`text`.
+    :param timeout: Optional request timeout in seconds.
+    :param raise_on_error: If ``True`` re-raises download errors; otherwise stops
+        iterating on failure.
+    :param chunk_size: Size (in bytes) of streaming chunks decoded at a time.
+    :return: Iterator of lines without their trailing line terminator.
+    """
+
+    try:
+        with requests.get(url, stream=True, timeout=timeout) as response:
+            response.raise_for_status()
+            parts: List[str] = []
+            for piece in _iter_decoded(response, encoding, chunk_size):
+                parts.append(piece)
+                if "\n" not in piece:
+                    continue
+                lines = "".join(parts).split("\n")
+                parts = [lines.pop()]
+                for line in lines:
+                    yield line[:-1] if line.endswith("\r") else line
+            remainder = "".join(parts)
+            if remainder:
+                yield remainder[:-1] if remainder.endswith("\r") else remainder
+    except (requests.RequestException, ValueError):
+        if raise_on_error:
+            raise
+
+
+def iter_ndjson(
+    url: str,
+    encoding: str = "",
+    timeout: int = DEFAULT_TIMEOUT,
+    raise_on_error: bool = True,
+    chunk_size: int = 65536,
+) -> Iterator:
+    """
+    Yield parsed records from a newline-delimited JSON (NDJSON) feed.
+
+    :param url: URL to retrieve.
+    :param encoding: Optional character encoding, resolved as in :func:`text`.
+    :param timeout: Optional request timeout in seconds.
+    :param raise_on_error: If ``True`` re-raises download or parse errors; otherwise
+        stops iterating on failure.
+    :param chunk_size: Size (in bytes) of streaming chunks decoded at a time.
+    :return: Iterator of decoded JSON values, one per non-blank line.
+    """
+
+    try:
+        for line in iter_lines(url, encoding, timeout, True, chunk_size):
+            if line.strip():
+                yield _json.loads(line)
+    except (requests.RequestException, ValueError):
+        if raise_on_error:
+            raise
+
+
 def json(url: str, timeout: int = DEFAULT_TIMEOUT, raise_on_error: bool = True):
     """
     Return the remote file as a dictionary.
@@ -255,6 +541,185 @@ def json(url: str, timeout: int = DEFAULT_TIMEOUT, raise_on_error: bool = True):
         return {}
 
 
+class _JSONStream:
+    """
+    Incremental scanner over decoded JSON text pieces, used by :func:`iter_json`.
+
+    Only the current piece is kept. Text of a value being parsed is collected as a
+    list of pieces and joined once; skipped values are discarded while scanned.
+    """
+
+    _NON_WHITESPACE = re.compile(r"[^ \t\n\r]")
+    _STRUCTURE = re.compile(r'["{}\[\]]')
+    _STRING_STOP = re.compile(r'["\\]')
+    _SCALAR_STOP = re.compile(r"[,:\]}\s]")
+
+    def __init__(self, pieces: Iterator[str]) -> None:
+        self._pieces = pieces
+        self._decoder = _json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+
+    def _next_piece(self) -> bool:
+        for piece in self._pieces:
+            if piece:
+                self.buf = piece
+                self.pos = 0
+                return True
+        self.buf = ""
+        self.pos = 0
+        return False
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character, or ``""`` at the end."""
+
+        while True:
+            match = self._NON_WHITESPACE.search(self.buf, self.pos)
+            if match is not None:
+                self.pos = match.start()
+                return self.buf[self.pos]
+            if not self._next_piece():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in JSON document, found {found!r}")
+        self.pos += 1
+
+    def _search(self, pattern, parts: Optional[List[str]], start: int):
+        """Find ``pattern`` from ``pos``, moving across pieces; keep text in ``parts``."""
+
+        while True:
+            match = pattern.search(self.buf, self.pos)
+            if match is not None:
+                return match, start
+            if parts is not None:
+                parts.append(self.buf[start:])
+            if not self._next_piece():
+                return None, 0
+            start = 0
+
+    def value(self, parse: bool = True):
+        """Consume the next value, decoding it unless ``parse`` is ``False``."""
+
+        if not self.peek():
+            raise ValueError("Unexpected end of JSON document")
+
+        parts: Optional[List[str]] = [] if parse else None
+        start = self.pos
+        if self.buf[self.pos] not in '"{[':
+            match, start = self._search(self._SCALAR_STOP, parts, start)
+            self.pos = match.start() if match is not None else len(self.buf)
+        else:
+            depth = 0
+            in_string = False
+            while True:
+                pattern = self._STRING_STOP if in_string else self._STRUCTURE
+                match, start = self._search(pattern, parts, start)
+                if match is None:
+                    raise ValueError("Unexpected end of JSON document")
+                self.pos = match.end()
+                char = match.group()
+                if char == "\\":
+                    if self.pos >= len(self.buf):
+                        if parts is not None:
+                            parts.append(self.buf[start:])
+                        start = 0
+                        if not self._next_piece():
+                            raise ValueError("Unexpected end of JSON document")
+                    self.pos += 1
+                    continue
+                if char == '"':
+                    in_string = not in_string
+                else:
+                    depth += 1 if char in "{[" else -1
+                if depth == 0 and not in_string:
+                    break
+
+        if parts is None:
+            return None
+        parts.append(self.buf[start:self.pos])
+        text = "".join(parts)
+        result, end = self._decoder.raw_decode(text)
+        if end != len(text):
+            raise ValueError(f"Invalid JSON value {text[:40]!r}")
+        return result
+
+    def seek(self, keys: List[str]) -> None:
+        """
+        Descend through nested objects by key.
+
+        Raises ``KeyError`` for a missing key and ``ValueError`` when a path
+        component is not an object.
+        """
+
+        for depth, key in enumerate(keys):
+            path = ".".join(keys[:depth + 1])
+            if self.peek() != "{":
+                raise ValueError(f"JSON path {path!r}: parent is not an object")
+            self.pos += 1
+            if self.peek() == "}":
+                raise KeyError(f"JSON path {path!r} not found")
+            while True:
+                name = self.value()
+                if not isinstance(name, str):
+                    raise ValueError("JSON object keys must be strings")
+                self.expect(":")
+                if name == key:
+                    break
+                self.value(parse=False)
+                if self.peek() == "}":
+                    raise KeyError(f"JSON path {path!r} not found")
+                self.expect(",")
+
+
+def iter_json(
+    url: str,
+    path: str = "",
+    timeout: int = DEFAULT_TIMEOUT,
+    raise_on_error: bool = True,
+    chunk_size: int = 65536,
+) -> Iterator:
+    """
+    Yield elements of a remote JSON array one at a time while it downloads.
+
+    Memory use is proportional to a single element rather than the whole document.
+
+    :param url: URL to retrieve the JSON content.
+    :param path: Optional dot-separated object keys leading to the array, e.g.
+        ``"data.items"``. Defaults to the top-level value. When the value found is
+        not an array it is yielded as a single item. A missing key raises
+        ``KeyError`` and a component that is not an object raises ``ValueError``.
+    :param timeout: Optional request timeout in seconds.
+    :param raise_on_error: If ``True`` re-raises download, parse or path errors;
+        otherwise stops iterating on failure.
+    :param chunk_size: Size (in bytes) of streaming chunks decoded at a time.
+    :return: Iterator of parsed JSON values.
+    """
+
+    try:
+        with requests.get(url, stream=True, timeout=timeout) as response:
+            response.raise_for_status()
+            stream = _JSONStream(_iter_decoded(response, "", chunk_size))
+            stream.seek([key for key in path.split(".") if key])
+            if stream.peek() != "[":
+                yield stream.value()
+                return
+
+            stream.pos += 1
+            if stream.peek() == "]":
+                return
+            while True:
+                yield stream.value()
+                if stream.peek() == "]":
+                    return
+                stream.expect(",")
+    except (requests.RequestException, KeyError, ValueError):
+        if raise_on_error:
+            raise
+
+
 def headers(
     url: str,
     redirect: bool = True,
@@ -323,29 +788,240 @@ def ftp(
         return ""
 
 
+def _layout_path(url: str, layout: Union[str, Callable[[str], str]]) -> str:
+    """
+    Return the path, relative to the ``save_multi`` directory, for ``url``.
+
+    ``"flat"`` keeps every file at the top level, ``"hash"`` shards files into two
+    levels of ``sha1(url)`` prefix directories and ``"mirror"`` reproduces the URL
+    host and path. A callable receives the URL and returns the relative path.
+    """
+
+    if callable(layout):
+        relative_path = layout(url)
+    elif layout == "flat":
+        relative_path = _default_filename(url)
+    elif layout == "hash":
+        digest = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        relative_path = os.path.join(digest[:2], digest[2:4], _default_filename(url))
+    elif layout == "mirror":
+        parsed_url = urlparse(url)
+        # ``hostname``/``port`` leave out any ``user:pass@`` credentials.
+        host = (parsed_url.hostname or "").replace(":", "_")
+        parts = [f"{host}_{parsed_url.port}" if parsed_url.port else host]
+        parts.extend(
+            part for part in parsed_url.path.split("/")[:-1] if part not in ("", ".", "..")
+        )
+        relative_path = os.path.join(*parts, _default_filename(url))
+    else:
+        raise ValueError("layout must be 'flat', 'hash', 'mirror' or a callable")
+
+    relative_path = os.path.normpath(relative_path)
+    if (
+        os.path.isabs(relative_path)
+        or os.path.splitdrive(relative_path)[0]
+        or relative_path == os.curdir
+        or relative_path.split(os.sep)[0] == os.pardir
+    ):
+        raise ValueError(f"layout path for {url!r} escapes the destination directory")
+    return relative_path
+
+
+def _existing_files(destination_dir: str, recursive: bool) -> set:
+    """Collect relative paths of files already present, using a single directory scan."""
+
+    existing = set()
+    if not recursive:
+        with os.scandir(destination_dir) as entries:
+            existing.update(entry.name for entry in entries if entry.is_file())
+        return existing
+
+    for root, _, files in os.walk(destination_dir):
+        relative_root = os.path.relpath(root, destination_dir)
+        for name in files:
+            existing.add(os.path.normpath(os.path.join(relative_root, name)))
+    return existing
+
+
+class _AutoTuner:
+    """
+    Per-host AIMD concurrency and chunk-size controller for ``save_multi``.
+
+    Each host starts with one connection and doubles its limit every round (one
+    completion per allowed connection) while throughput keeps improving, then
+    grows by one. Throttling responses, errors or a sharp latency rise halve the
+    limit. The total number of connections never exceeds ``max_threads``.
+    """
+
+    def __init__(self, max_threads: int, chunk_size: int) -> None:
+        self.max_threads = max(1, max_threads)
+        self._chunk_size = chunk_size
+        self._condition = threading.Condition()
+        self._active = 0
+        self._turn = 0
+        self._hosts: Dict[str, dict] = {}
+
+    def _host(self, host: str) -> dict:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = {
+                "limit": 1,
+                "active": 0,
+                "slow_start": True,
+                "chunk_size": self._chunk_size,
+                "round_bytes": 0,
+                "round_count": 0,
+                "round_start": time.perf_counter(),
+                "throughput": 0.0,
+                "latency": 0.0,
+                "min_latency": 0.0,
+            }
+        return state
+
+    def acquire_any(self, hosts: List[str]) -> Tuple[str, int]:
+        """
+        Block until one of ``hosts`` may open another connection.
+
+        Hosts are tried in rotating order so a host at its limit never holds back
+        the others. Return the chosen host and its chunk size.
+        """
+
+        with self._condition:
+            while True:
+                if self._active < self.max_threads:
+                    offset = self._turn % len(hosts)
+                    for host in hosts[offset:] + hosts[:offset]:
+                        state = self._host(host)
+                        if state["active"] < state["limit"]:
+                            self._turn += 1
+                            self._active += 1
+                            state["active"] += 1
+                            return host, state["chunk_size"]
+                self._condition.wait()
+
+    def acquire(self, host: str) -> int:
+        """Block until ``host`` may open another connection; return its chunk size."""
+
+        return self.acquire_any([host])[1]
+
+    def _decrease(self, state: dict) -> None:
+        state["limit"] = max(1, state["limit"] // 2)
+        state["slow_start"] = False
+        state["round_bytes"] = 0
+        state["round_count"] = 0
+        state["round_start"] = time.perf_counter()
+
+    def release(
+        self,
+        host: str,
+        size: int = 0,
+        latency: float = 0.0,
+        chunk_size: int = 0,
+        throttled: bool = False,
+    ) -> None:
+        """Record a finished download for ``host`` and adjust its limits."""
+
+        with self._condition:
+            state = self._host(host)
+            self._active -= 1
+            state["active"] -= 1
+            self._condition.notify_all()
+
+            if throttled:
+                self._decrease(state)
+                return
+
+            if chunk_size:
+                state["chunk_size"] = chunk_size
+            if latency > 0:
+                state["latency"] = latency
+                min_latency = state["min_latency"]
+                if not min_latency or latency < min_latency:
+                    state["min_latency"] = latency
+                elif latency > 4 * min_latency and latency > 0.2:
+                    self._decrease(state)
+                    return
+
+            state["round_bytes"] += size
+            state["round_count"] += 1
+            if state["round_count"] < state["limit"]:
+                return
+
+            elapsed = max(time.perf_counter() - state["round_start"], 1e-6)
+            throughput = state["round_bytes"] / elapsed
+            if throughput > state["throughput"] * 1.05:
+                growth = state["limit"] if state["slow_start"] else 1
+                state["limit"] = min(state["limit"] + growth, self.max_threads)
+            else:
+                state["slow_start"] = False
+                if throughput < state["throughput"] * 0.9 and state["limit"] > 1:
+                    state["limit"] -= 1
+            state["throughput"] = throughput
+            state["round_bytes"] = 0
+            state["round_count"] = 0
+            state["round_start"] = time.perf_counter()
+
+    def report(self) -> dict:
+        """Return the converged settings, overall and per host."""
+
+        with self._condition:
+            hosts = {
+                host: {
+                    "max_threads": state["limit"],
+                    "chunk_size": state["chunk_size"],
+                    "throughput": state["throughput"],
+                    "latency": state["latency"],
+                }
+                for host, state in self._hosts.items()
+            }
+        return {
+            "max_threads": min(
+                sum(host["max_threads"] for host in hosts.values()), self.max_threads
+            )
+            if hosts
+            else 0,
+            "chunk_size": max((host["chunk_size"] for host in hosts.values()), default=0),
+            "hosts": hosts,
+        }
+
+
 def save_multi(
     url_list: Iterable[str],
     dir: str = "",
-    max_threads: int = 1,
+    max_threads: Optional[int] = None,
     tsleep: float = 0.05,
     timeout: int = DEFAULT_TIMEOUT,
     raise_on_error: bool = True,
+    layout: Union[str, Callable[[str], str]] = "flat",
+    auto_tune: bool = False,
+    tuning: Optional[dict] = None,
 ) -> bool:
     """
     Multi-threaded file downloader.
 
     :param url_list: List of URLs or path to a text file containing URLs.
     :param dir: Directory to save the files; will be created if it does not exist.
-    :param max_threads: Maximum number of parallel downloads.
+    :param max_threads: Maximum number of parallel downloads. Defaults to 1, or to
+        ``MAX_AUTO_THREADS`` when ``auto_tune`` is enabled.
     :param tsleep: Time (seconds) to wait between thread scheduling attempts.
-    :param timeout: Optional request timeout in seconds.
+    :param timeout: Optional request timeout in seconds; also the longest
+        ``auto_tune`` waits before retrying a throttled request.
     :param raise_on_error: If ``True`` re-raises the first encountered download error;
         otherwise returns ``False`` when any download fails.
+    :param layout: How files are arranged under ``dir``: ``"flat"``, ``"hash"``
+        (sharded by URL hash prefix), ``"mirror"`` (URL host and path) or a callable
+        mapping a URL to a relative path. Existing files are found with one scan of
+        ``dir`` up front and skipped.
+    :param auto_tune: If ``True`` concurrency is adjusted per host (AIMD) from the
+        observed throughput and latency, up to ``max_threads`` connections,
+        chunk sizes adapt to read times, ``tsleep`` is skipped and throttled
+        requests (HTTP 429/503) are retried with backoff.
+    :param tuning: Optional ``dict`` updated with the settings ``auto_tune``
+        converged on: ``max_threads``, ``chunk_size`` and per-host ``hosts`` stats.
     :return: ``True`` when all downloads finish, otherwise ``False`` when
         ``raise_on_error`` is ``False``.
     """
 
-    import threading
     from time import sleep
 
     try:
@@ -357,50 +1033,134 @@ def save_multi(
             urls = list(url_list)
 
         destination_dir = os.path.abspath(os.path.expanduser(dir)) if dir else ""
-        if destination_dir and not os.path.exists(destination_dir):
-            from pathlib import Path
-
-            Path(destination_dir).mkdir(parents=True, exist_ok=True)
-
+        existing = set()
+        if destination_dir:
+            os.makedirs(destination_dir, exist_ok=True)
+            existing = _existing_files(destination_dir, recursive=layout != "flat")
+        created_dirs = {destination_dir}
+
+        if max_threads is None:
+            max_threads = MAX_AUTO_THREADS if auto_tune else 1
         semaphore = threading.Semaphore(max_threads if max_threads > 0 else 1)
+        tuner = _AutoTuner(max_threads, 65536) if auto_tune else None
         threads: List[threading.Thread] = []
 
         exceptions: List[BaseException] = []
         exception_lock = threading.Lock()
 
+        def _fetch(target_url: str, destination_path: str, chunk_size: int):
+            start = time.perf_counter()
+            if not destination_path:
+                saved_path = save(
+                    target_url, timeout=timeout, chunk_size=chunk_size, raise_on_error=True
+                )
+                return os.path.getsize(saved_path), 0.0, chunk_size
+            with requests.get(target_url, stream=True, timeout=timeout) as response:
+                latency = time.perf_counter() - start
+                response.raise_for_status()
+                size, chunk_size = _write_response(
+                    response, destination_path, chunk_size, adaptive=tuner is not None
+                )
+            return size, latency, chunk_size
+
         def _download(target_url: str, destination_path: str) -> None:
             try:
-                save(
-                    target_url,
-                    destination_path,
-                    timeout=timeout,
-                    overwrite=False,
-                    raise_on_error=raise_on_error,
-                )
+                _fetch(target_url, destination_path, 8192)
             except BaseException as error:  # noqa: BLE001
                 with exception_lock:
                     exceptions.append(error)
             finally:
                 semaphore.release()
 
+        def _download_tuned(
+            target_url: str, destination_path: str, chunk_size: int
+        ) -> None:
+            host = urlparse(target_url).netloc
+            held = True
+            try:
+                for attempt in range(4):
+                    try:
+                        size, latency, chunk_size = _fetch(
+                            target_url, destination_path, chunk_size
+                        )
+                    except requests.HTTPError as error:
+                        response = error.response
+                        status = response.status_code if response is not None else 0
+                        if status not in THROTTLE_STATUS or attempt == 3:
+                            raise
+                        retry_after = response.headers.get("retry-after", "")
+                        if retry_after.isdigit():
+                            delay = float(retry_after)
+                        else:
+                            delay = 0.5 * 2 ** attempt
+                        if delay > timeout:
+                            raise
+                        tuner.release(host, throttled=True)
+                        held = False
+                        sleep(delay)
+                        chunk_size = tuner.acquire(host)
+                        held = True
+                        continue
+                    tuner.release(host, size, latency, chunk_size)
+                    held = False
+                    return
+            except BaseException as error:  # noqa: BLE001
+                with exception_lock:
+                    exceptions.append(error)
+                if held:
+                    tuner.release(host, throttled=True)
+
+        jobs: List[Tuple[str, str]] = []
         for url in urls:
             if destination_dir:
-                filename = _default_filename(url)
-                download_path = os.path.join(destination_dir, filename)
+                relative_path = _layout_path(url, layout)
+                if relative_path in existing:
+                    continue
+                existing.add(relative_path)
+                download_path = os.path.join(destination_dir, relative_path)
+                parent_dir = os.path.dirname(download_path)
+                if parent_dir not in created_dirs:
+                    os.makedirs(parent_dir, exist_ok=True)
+                    created_dirs.add(parent_dir)
             else:
                 download_path = ""
+            jobs.append((url, download_path))
+
+        if tuner is not None:
+            # One queue per host, so a host at its limit does not block the others.
+            queues: Dict[str, Deque[Tuple[str, str]]] = {}
+            for job in jobs:
+                queues.setdefault(urlparse(job[0]).netloc, deque()).append(job)
+            while queues:
+                host, chunk_size = tuner.acquire_any(list(queues))
+                url, download_path = queues[host].popleft()
+                if not queues[host]:
+                    del queues[host]
+                thread = threading.Thread(
+                    target=_download_tuned,
+                    args=(url, download_path, chunk_size),
+                    name="dload",
+                    daemon=True,
+                )
+                threads.append(thread)
+                thread.start()
 
-            semaphore.acquire()
-            thread = threading.Thread(
-                target=_download, args=(url, download_path), name="dload", daemon=True
-            )
-            threads.append(thread)
-            thread.start()
-            sleep(tsleep)
+        else:
+            for url, download_path in jobs:
+                semaphore.acquire()
+                thread = threading.Thread(
+                    target=_download, args=(url, download_path), name="dload", daemon=True
+                )
+                threads.append(thread)
+                thread.start()
+                sleep(tsleep)
 
         for thread in threads:
             thread.join()
 
+        if tuner is not None and tuning is not None:
+            tuning.update(tuner.report())
+
         if exceptions:
             if raise_on_error:
                 raise exceptions[0]
@@ -511,19 +1271,155 @@ def save_unzip(
         return ""
 
 
+class _TeeReader:
+    """File-like wrapper that copies everything read from ``source`` into ``sink``."""
+
+    def __init__(self, source, sink) -> None:
+        self._source = source
+        self._sink = sink
+
+    def read(self, size: int = -1) -> "bytes":
+        data = self._source.read(size)
+        if data:
+            self._sink.write(data)
+        return data
+
+
+def _inside(root: str, path: str) -> bool:
+    return os.path.commonpath([root, path]) == root
+
+
+def _safe_tar_members(
+    tar: tarfile.TarFile, destination: str
+) -> Iterator[tarfile.TarInfo]:
+    """
+    Yield tar members that stay inside ``destination``, for interpreters without
+    ``tarfile.data_filter``.
+
+    Members whose path leaves ``destination`` raise ``tarfile.TarError``. Links
+    pointing outside it and device or FIFO members are skipped.
+    """
+
+    root = os.path.realpath(destination)
+    for member in tar:
+        target = os.path.realpath(os.path.join(root, member.name))
+        if os.path.isabs(member.name) or not _inside(root, target):
+            raise tarfile.TarError(
+                f"Archive member {member.name!r} escapes {destination}"
+            )
+        if member.issym():
+            link_target = os.path.realpath(
+                os.path.join(os.path.dirname(target), member.linkname)
+            )
+            if os.path.isabs(member.linkname) or not _inside(root, link_target):
+                continue
+        elif member.islnk():
+            link_target = os.path.realpath(os.path.join(root, member.linkname))
+            if os.path.isabs(member.linkname) or not _inside(root, link_target):
+                continue
+        elif not (member.isfile() or member.isdir()):
+            continue
+        yield member
+
+
+def _extract_tar(tar: tarfile.TarFile, destination: str) -> None:
+    if hasattr(tarfile, "data_filter"):
+        tar.extractall(destination, filter="data")
+    else:
+        tar.extractall(destination, members=_safe_tar_members(tar, destination))
+
+
+def _extract_archive(archive_path: str, destination: str, archive_format: str) -> None:
+    if archive_format == "zip":
+        with zipfile.ZipFile(archive_path, "r") as zip_ref:
+            zip_ref.extractall(destination)
+    else:
+        with tarfile.open(archive_path, "r:gz") as tar:
+            _extract_tar(tar, destination)
+
+
+def _fetch_archive(
+    archive_url: str,
+    destination: str,
+    archive_format: str,
+    cache_path: str,
+) -> None:
+    """
+    Download and extract a repository archive, storing a copy at ``cache_path``.
+
+    ``.tar.gz`` archives are extracted in a single streaming pass while being
+    written to the cache. The cache file is moved into place only once complete.
+    """
+
+    partial_path = ""
+    try:
+        if cache_path:
+            # A unique partial file per writer lets concurrent clones share a cache.
+            handle, partial_path = tempfile.mkstemp(
+                suffix=".part", dir=os.path.dirname(cache_path)
+            )
+            os.close(handle)
+
+        if archive_format == "zip":
+            save(archive_url, partial_path, overwrite=True)
+            os.replace(partial_path, cache_path)
+            _extract_archive(cache_path, destination, archive_format)
+            return
+
+        with requests.get(archive_url, stream=True, timeout=DEFAULT_TIMEOUT) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            if not partial_path:
+                with tarfile.open(fileobj=response.raw, mode="r|gz") as tar:
+                    _extract_tar(tar, destination)
+                return
+
+            with open(partial_path, "wb") as sink:
+                source = _TeeReader(response.raw, sink)
+                with tarfile.open(fileobj=source, mode="r|gz") as tar:
+                    _extract_tar(tar, destination)
+                # Read any trailing padding so the cached archive is complete.
+                while source.read(65536):
+                    pass
+            os.replace(partial_path, cache_path)
+    finally:
+        if partial_path and os.path.isfile(partial_path):
+            os.remove(partial_path)
+
+
+def _cache_is_fresh(cache_path: str, ttl: float) -> bool:
+    if not cache_path:
+        return False
+    try:
+        return time.time() - os.path.getmtime(cache_path) < ttl
+    except OSError:
+        return False
+
+
 def git_clone(
     git_url: str,
     clone_dir: str = "",
     raise_on_error: bool = True,
+    branch: str = "",
+    cache_dir: str = "",
+    archive_format: str = "zip",
+    cache_ttl: float = ARCHIVE_CACHE_TTL,
 ) -> str:
     """
-    Clone a git repository by downloading its default branch zip archive.
+    Clone a git repository by downloading its default branch archive.
 
     :param git_url: Git URL, e.g. ``https://github.com/x011/dload.git``.
     :param clone_dir: Local directory to extract into; defaults to the caller directory
         plus the repository name.
     :param raise_on_error: If ``True`` re-raises download or extraction errors;
         otherwise returns an empty string on failure.
+    :param branch: Branch to download; defaults to the repository's default branch.
+    :param cache_dir: Optional directory where archives are kept, keyed by repository
+        and branch, so repeat clones are extracted from the local copy.
+    :param archive_format: ``"zip"`` or ``"tar.gz"``; tarballs are extracted in a
+        single streaming pass.
+    :param cache_ttl: Seconds a cached archive is reused before it is downloaded
+        again, so moved branches are picked up.
     :return: Path to the local repository directory or an empty string on failure when
         ``raise_on_error`` is ``False``.
     """
@@ -535,36 +1431,75 @@ def git_clone(
         return ""
 
     try:
+        if archive_format not in ("zip", "tar.gz"):
+            raise ValueError("archive_format must be 'zip' or 'tar.gz'")
+
         repo_name = re.sub(r"\.git$", "", git_url, 0, re.IGNORECASE | re.MULTILINE)
-        default_branch = _github_default_branch(repo_name, raise_on_error=raise_on_error) or "master"
-        repo_zip = f"{repo_name}/archive/refs/heads/{default_branch}.zip"
-        archive_filename = os.path.basename(urlparse(repo_zip).path)
+        default_branch = (
+            branch.strip()
+            or _github_default_branch(repo_name, raise_on_error=raise_on_error)
+            or "master"
+        )
+        repo_archive = f"{repo_name}/archive/refs/heads/{default_branch}.{archive_format}"
+        archive_filename = os.path.basename(urlparse(repo_archive).path)
+        repo_folder = repo_name.split("/")[-1]
 
         if not clone_dir:
             namespace = sys._getframe(1).f_globals if sys._getframe(1) else None
             caller_dir = _get_caller_dir(namespace)
-            repo_folder = repo_name.split("/")[-1]
             clone_dir = os.path.join(caller_dir, repo_folder)
         else:
             if not re.search(r"/|\\$", clone_dir, re.IGNORECASE | re.MULTILINE):
                 return ""
 
-        if archive_filename and os.path.isfile(archive_filename):
-            os.remove(archive_filename)
+        if archive_format == "zip" and not cache_dir:
+            if archive_filename and os.path.isfile(archive_filename):
+                os.remove(archive_filename)
 
-        return save_unzip(
-            repo_zip, clone_dir, delete_after=True, raise_on_error=raise_on_error
-        )
-    except (OSError, ValueError):
+            return save_unzip(
+                repo_archive, clone_dir, delete_after=True, raise_on_error=raise_on_error
+            )
+
+        destination = os.path.abspath(os.path.expanduser(clone_dir))
+        cache_path = ""
+        if cache_dir:
+            cache_root = os.path.abspath(os.path.expanduser(cache_dir))
+            os.makedirs(cache_root, exist_ok=True)
+            digest = hashlib.sha1(repo_archive.encode("utf-8")).hexdigest()[:16]
+            cache_path = os.path.join(
+                cache_root, f"{repo_folder}-{digest}.{archive_format}"
+            )
+
+        if _cache_is_fresh(cache_path, cache_ttl):
+            try:
+                _extract_archive(cache_path, destination, archive_format)
+                return destination
+            except (tarfile.TarError, zipfile.BadZipFile, EOFError):
+                # Drop the corrupt copy and fall back to a fresh download.
+                if os.path.isfile(cache_path):
+                    os.remove(cache_path)
+
+        _fetch_archive(repo_archive, destination, archive_format, cache_path)
+        return destination
+    except (OSError, ValueError, tarfile.TarError, zipfile.BadZipFile):
         if raise_on_error:
             raise
         return ""
 
 
+_default_branch_cache: Dict[str, Tuple[float, str]] = {}
+_default_branch_lock = threading.Lock()
+
+
 def _github_default_branch(
     repo_name: str, raise_on_error: bool = True
 ) -> Optional[str]:
-    """Return the default branch name for a GitHub repository when possible."""
+    """
+    Return the default branch name for a GitHub repository when possible.
+
+    Successful lookups are memoized for ``DEFAULT_BRANCH_TTL`` seconds to avoid
+    repeated, rate-limited API calls.
+    """
 
     parsed_url = urlparse(repo_name)
     if parsed_url.netloc.lower() != "github.com":
@@ -575,7 +1510,13 @@ def _github_default_branch(
         return None
 
     repo_path = "/".join(path_parts[:2])
-    api_url = f"https://api.github.com/repos/{repo_path}"
+    cache_key = repo_path.lower()
+    with _default_branch_lock:
+        cached = _default_branch_cache.get(cache_key)
+    if cached and time.monotonic() - cached[0] < DEFAULT_BRANCH_TTL:
+        return cached[1]
+
+    api_url = f"{GITHUB_API_URL}/repos/{repo_path}"
 
     try:
         response = requests.get(api_url, timeout=DEFAULT_TIMEOUT)
@@ -584,7 +1525,10 @@ def _github_default_branch(
         if isinstance(data, dict):
             default_branch = data.get("default_branch")
             if isinstance(default_branch, str) and default_branch.strip():
-                return default_branch.strip()
+                default_branch = default_branch.strip()
+                with _default_branch_lock:
+                    _default_branch_cache[cache_key] = (time.monotonic(), default_branch)
+                return default_branch
     except requests.RequestException:
         if raise_on_error:
             raise
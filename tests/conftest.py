@@ -0,0 +1,93 @@
+"""
+Shared fixtures: a local threaded HTTP server standing in for remote endpoints.
+"""
+
+import http.server
+import socketserver
+import threading
+from typing import Callable, Dict, List, Tuple, Union
+
+import pytest
+
+Route = Union[Tuple[int, Dict[str, str], bytes], Callable]
+
+
+class _Server(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class LocalServer:
+    """
+    Serve ``routes`` (path -> ``(status, headers, body)`` or a callable).
+
+    A callable route receives the request handler and writes the response itself.
+    Every requested path is appended to ``requests``.
+    """
+
+    def __init__(self) -> None:
+        self.routes: Dict[str, Route] = {}
+        self.requests: List[str] = []
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                server.requests.append(self.path)
+                route = server.routes.get(self.path)
+                if route is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                if callable(route):
+                    route(self)
+                    return
+                status, headers, body = route
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._httpd = _Server(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, args=(0.05,), daemon=True
+        )
+        self._thread.start()
+
+    def add(self, path: str, body: bytes = b"", status: int = 200, **headers) -> None:
+        self.routes[path] = (
+            status,
+            {name.replace("_", "-"): value for name, value in headers.items()},
+            body,
+        )
+
+    def close(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+def send_chunked(handler, body: bytes, chunk_size: int = 1000) -> None:
+    """Write ``body`` using ``Transfer-Encoding: chunked``."""
+
+    handler.send_response(200)
+    handler.send_header("Transfer-Encoding", "chunked")
+    handler.end_headers()
+    for start in range(0, len(body), chunk_size):
+        chunk = body[start:start + chunk_size]
+        handler.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+    handler.wfile.write(b"0\r\n\r\n")
+
+
+@pytest.fixture
+def server():
+    local_server = LocalServer()
+    yield local_server
+    local_server.close()
@@ -0,0 +1,169 @@
+import threading
+import time
+
+import pytest
+import requests
+
+import dload
+from conftest import LocalServer, send_chunked
+
+BODY = bytes(range(256)) * 2000
+
+
+def _truncated(handler) -> None:
+    handler.send_response(200)
+    handler.send_header("Content-Length", "1000")
+    handler.end_headers()
+    handler.wfile.write(b"x" * 500)
+    handler.close_connection = True
+
+
+def _throttled_once():
+    seen = set()
+    lock = threading.Lock()
+
+    def _send(handler) -> None:
+        with lock:
+            first = handler.path not in seen
+            seen.add(handler.path)
+        if first:
+            handler.send_response(429)
+            handler.send_header("Retry-After", "0")
+            handler.send_header("Content-Length", "0")
+            handler.end_headers()
+            return
+        handler.send_response(200)
+        handler.send_header("Content-Length", "3")
+        handler.end_headers()
+        handler.wfile.write(b"abc")
+
+    return _send
+
+
+@pytest.fixture
+def other_server():
+    local_server = LocalServer()
+    yield local_server
+    local_server.close()
+
+
+def test_adaptive_save_reads_whole_chunked_body(server, tmp_path):
+    server.routes["/chunked"] = lambda handler: send_chunked(handler, BODY)
+    path = str(tmp_path / "out.bin")
+
+    dload.save(server.url + "/chunked", path, chunk_size=0)
+
+    assert (tmp_path / "out.bin").read_bytes() == BODY
+
+
+def test_auto_tune_reads_whole_chunked_bodies(server, tmp_path):
+    for index in range(4):
+        server.routes[f"/chunked{index}"] = lambda handler: send_chunked(handler, BODY)
+    urls = [f"{server.url}/chunked{index}" for index in range(4)]
+
+    assert dload.save_multi(urls, str(tmp_path), max_threads=4, auto_tune=True)
+    for index in range(4):
+        assert (tmp_path / f"chunked{index}").read_bytes() == BODY
+
+
+@pytest.mark.parametrize("chunk_size", [0, 8192])
+def test_truncated_body_raises(server, tmp_path, chunk_size):
+    server.routes["/short"] = _truncated
+
+    with pytest.raises(requests.RequestException):
+        dload.save(server.url + "/short", str(tmp_path / "short"), chunk_size=chunk_size)
+
+
+def test_busy_host_does_not_block_other_hosts(server, other_server, tmp_path):
+    arrivals = []
+
+    def _slow(handler) -> None:
+        time.sleep(0.3)
+        handler.send_response(200)
+        handler.send_header("Content-Length", "1")
+        handler.end_headers()
+        handler.wfile.write(b"s")
+
+    def _fast(handler) -> None:
+        arrivals.append(time.perf_counter())
+        handler.send_response(200)
+        handler.send_header("Content-Length", "1")
+        handler.end_headers()
+        handler.wfile.write(b"f")
+
+    slow_urls = [f"{server.url}/slow{index}" for index in range(4)]
+    fast_urls = [f"{other_server.url}/fast{index}" for index in range(4)]
+    for url in slow_urls:
+        server.routes[url[len(server.url):]] = _slow
+    for url in fast_urls:
+        other_server.routes[url[len(other_server.url):]] = _fast
+
+    start = time.perf_counter()
+    assert dload.save_multi(
+        slow_urls + fast_urls, str(tmp_path), max_threads=4, auto_tune=True
+    )
+
+    assert len(arrivals) == 4
+    assert max(arrivals) - start < 0.3
+
+
+def test_throttled_requests_are_retried_and_reported(server, tmp_path):
+    urls = [f"{server.url}/t{index}" for index in range(3)]
+    for url in urls:
+        server.routes[url[len(server.url):]] = _throttled_once()
+    tuning = {}
+
+    assert dload.save_multi(
+        urls, str(tmp_path), max_threads=4, auto_tune=True, tuning=tuning
+    )
+
+    host = server.url.split("//", 1)[1]
+    assert set(tuning) == {"max_threads", "chunk_size", "hosts"}
+    assert tuning["hosts"][host]["max_threads"] >= 1
+
+
+def test_long_retry_after_fails_instead_of_waiting(server, tmp_path):
+    server.add("/later", status=429, Retry_After="3600")
+
+    start = time.perf_counter()
+    result = dload.save_multi(
+        [server.url + "/later"],
+        str(tmp_path),
+        auto_tune=True,
+        timeout=1,
+        raise_on_error=False,
+    )
+
+    assert result is False
+    assert time.perf_counter() - start < 5
+
+
+def test_tuner_halves_limit_when_throttled():
+    tuner = dload._AutoTuner(max_threads=8, chunk_size=65536)
+    tuner._host("h")["limit"] = 6
+
+    tuner.acquire("h")
+    tuner.release("h", throttled=True)
+
+    assert tuner.report()["hosts"]["h"]["max_threads"] == 3
+
+
+def test_auto_tune_grows_without_explicit_max_threads(server, tmp_path):
+    def _slow(handler) -> None:
+        time.sleep(0.05)
+        handler.send_response(200)
+        handler.send_header("Content-Length", "1")
+        handler.end_headers()
+        handler.wfile.write(b"s")
+
+    urls = [f"{server.url}/slow{index}" for index in range(60)]
+    for url in urls:
+        server.routes[url[len(server.url):]] = _slow
+    tuning = {}
+
+    start = time.perf_counter()
+    assert dload.save_multi(urls, str(tmp_path), auto_tune=True, tuning=tuning)
+    elapsed = time.perf_counter() - start
+
+    assert tuning["max_threads"] > 1
+    assert elapsed < 60 * 0.05 / 2
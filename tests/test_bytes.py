@@ -0,0 +1,65 @@
+import mmap
+
+import pytest
+
+import dload
+from conftest import send_chunked
+
+BODY = bytes(range(256)) * 40
+
+
+def test_small_body_stays_bytes(server):
+    server.add("/small", b"abc")
+
+    assert dload.bytes(server.url + "/small", spool_threshold=1024) == b"abc"
+
+
+def test_body_at_threshold_stays_bytes(server):
+    server.add("/exact", BODY)
+
+    data = dload.bytes(server.url + "/exact", spool_threshold=len(BODY), chunk_size=100)
+
+    assert type(data) is bytes
+    assert data == BODY
+
+
+def test_body_over_threshold_is_read_only_mmap(server):
+    server.add("/large", BODY)
+
+    data = dload.bytes(server.url + "/large", spool_threshold=len(BODY) - 1, chunk_size=100)
+
+    assert isinstance(data, mmap.mmap)
+    with data:
+        assert len(data) == len(BODY)
+        assert data[:] == BODY
+        with pytest.raises(TypeError):
+            data[0] = 1
+    assert data.closed
+
+
+def test_max_size_rejects_from_content_length(server):
+    server.add("/large", BODY)
+
+    with pytest.raises(ValueError, match="max_size"):
+        dload.bytes(server.url + "/large", max_size=100)
+    assert server.requests == ["/large"]
+
+
+def test_max_size_rejects_chunked_body_while_streaming(server):
+    server.routes["/chunked"] = lambda handler: send_chunked(handler, BODY, 100)
+
+    with pytest.raises(ValueError, match="max_size"):
+        dload.bytes(server.url + "/chunked", max_size=1000, chunk_size=100)
+
+
+def test_max_size_allows_smaller_body(server):
+    server.routes["/chunked"] = lambda handler: send_chunked(handler, BODY, 100)
+
+    assert dload.bytes(server.url + "/chunked", max_size=len(BODY)) == BODY
+
+
+def test_errors_return_empty_bytes_when_not_raising(server):
+    server.add("/large", BODY)
+
+    assert dload.bytes(server.url + "/large", max_size=100, raise_on_error=False) == b""
+    assert dload.bytes(server.url + "/missing", raise_on_error=False) == b""
@@ -0,0 +1,210 @@
+import io
+import os
+import tarfile
+import threading
+import time
+import zipfile
+
+import pytest
+
+import dload
+
+ARCHIVE_PATH = "/org/repo/archive/refs/heads/master"
+
+
+def _tar_gz(*extra: tarfile.TarInfo) -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+        data = b"hello"
+        info = tarfile.TarInfo("repo-master/sub/file.txt")
+        info.size = len(data)
+        tar.addfile(info, io.BytesIO(data))
+        for member in extra:
+            tar.addfile(member, io.BytesIO(b"x" * member.size))
+    return buffer.getvalue()
+
+
+def _member(
+    name: str, kind: bytes = tarfile.REGTYPE, linkname: str = ""
+) -> tarfile.TarInfo:
+    info = tarfile.TarInfo(name)
+    info.type = kind
+    info.linkname = linkname
+    info.size = 1 if kind == tarfile.REGTYPE else 0
+    return info
+
+
+def _zip() -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("repo-master/sub/file.txt", "hello")
+    return buffer.getvalue()
+
+
+def _slow_route(body: bytes):
+    def _send(handler) -> None:
+        handler.send_response(200)
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        for start in range(0, len(body), 64):
+            handler.wfile.write(body[start:start + 64])
+            handler.wfile.flush()
+            time.sleep(0.005)
+
+    return _send
+
+
+@pytest.fixture
+def repo(server):
+    server.add(ARCHIVE_PATH + ".tar.gz", _tar_gz())
+    server.add(ARCHIVE_PATH + ".zip", _zip())
+    return server.url + "/org/repo.git"
+
+
+def _cloned_file(clone_dir) -> str:
+    with open(os.path.join(str(clone_dir), "repo-master", "sub", "file.txt")) as handle:
+        return handle.read()
+
+
+@pytest.fixture
+def github_api(server, monkeypatch):
+    monkeypatch.setattr(dload, "GITHUB_API_URL", server.url)
+    monkeypatch.setattr(dload, "_default_branch_cache", {})
+    server.add("/repos/o/x", b'{"default_branch": "main"}')
+    return server
+
+
+def test_default_branch_is_memoized(github_api):
+    assert dload._github_default_branch("https://github.com/o/x") == "main"
+    assert dload._github_default_branch("https://github.com/O/X") == "main"
+    assert github_api.requests == ["/repos/o/x"]
+
+
+def test_default_branch_cache_expires(github_api, monkeypatch):
+    monkeypatch.setattr(dload, "DEFAULT_BRANCH_TTL", 0)
+
+    dload._github_default_branch("https://github.com/o/x")
+    dload._github_default_branch("https://github.com/o/x")
+
+    assert github_api.requests == ["/repos/o/x", "/repos/o/x"]
+
+
+def test_tar_gz_is_extracted_while_streaming(repo, tmp_path):
+    clone_dir = str(tmp_path / "clone") + "/"
+
+    assert dload.git_clone(repo, clone_dir, archive_format="tar.gz")
+    assert _cloned_file(clone_dir) == "hello"
+
+
+@pytest.fixture(params=["data_filter", "fallback"])
+def tar_extraction(request, monkeypatch):
+    if request.param == "fallback":
+        monkeypatch.delattr(tarfile, "data_filter", raising=False)
+    return request.param
+
+
+@pytest.mark.parametrize("name", ["../escape.txt", "repo-master/../../escape.txt"])
+def test_tar_member_escaping_clone_dir_is_rejected(
+    server, repo, tmp_path, tar_extraction, name
+):
+    server.add(ARCHIVE_PATH + ".tar.gz", _tar_gz(_member(name)))
+    clone_dir = tmp_path / "deep" / "clone"
+
+    with pytest.raises(tarfile.TarError):
+        dload.git_clone(repo, str(clone_dir) + "/", archive_format="tar.gz")
+    assert not (tmp_path / "deep" / "escape.txt").exists()
+    assert not (tmp_path / "escape.txt").exists()
+
+
+def test_fallback_skips_escaping_links(server, repo, tmp_path, monkeypatch):
+    monkeypatch.delattr(tarfile, "data_filter", raising=False)
+    server.add(
+        ARCHIVE_PATH + ".tar.gz",
+        _tar_gz(
+            _member("repo-master/abs", tarfile.SYMTYPE, "/etc"),
+            _member("repo-master/up", tarfile.SYMTYPE, "../../outside"),
+            _member("repo-master/hard", tarfile.LNKTYPE, "../outside"),
+            _member("repo-master/ok", tarfile.SYMTYPE, "sub/file.txt"),
+        ),
+    )
+    clone_dir = str(tmp_path / "clone") + "/"
+
+    assert dload.git_clone(repo, clone_dir, archive_format="tar.gz")
+
+    extracted = tmp_path / "clone" / "repo-master"
+    assert sorted(path.name for path in extracted.iterdir()) == ["ok", "sub"]
+    assert (extracted / "ok").read_text() == "hello"
+
+
+@pytest.mark.parametrize("archive_format", ["zip", "tar.gz"])
+def test_cache_hit_makes_no_request(server, repo, tmp_path, archive_format):
+    cache_dir = str(tmp_path / "cache")
+    dload.git_clone(
+        repo, str(tmp_path / "a") + "/", cache_dir=cache_dir, archive_format=archive_format
+    )
+    request_count = len(server.requests)
+    server.routes.clear()
+
+    clone_dir = str(tmp_path / "b") + "/"
+    dload.git_clone(repo, clone_dir, cache_dir=cache_dir, archive_format=archive_format)
+
+    assert len(server.requests) == request_count
+    assert _cloned_file(clone_dir) == "hello"
+    assert [name for name in os.listdir(cache_dir) if name.endswith(".part")] == []
+
+
+def test_expired_cache_is_downloaded_again(server, repo, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    for name in ("a", "b"):
+        dload.git_clone(
+            repo,
+            str(tmp_path / name) + "/",
+            cache_dir=cache_dir,
+            archive_format="tar.gz",
+            cache_ttl=0,
+        )
+
+    assert server.requests.count(ARCHIVE_PATH + ".tar.gz") == 2
+
+
+def test_corrupt_cache_is_replaced(server, repo, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    dload.git_clone(repo, str(tmp_path / "a") + "/", cache_dir=cache_dir)
+    (cached,) = os.listdir(cache_dir)
+    with open(os.path.join(cache_dir, cached), "wb") as handle:
+        handle.write(b"not a zip")
+
+    clone_dir = str(tmp_path / "b") + "/"
+    assert dload.git_clone(repo, clone_dir, cache_dir=cache_dir)
+    assert _cloned_file(clone_dir) == "hello"
+    assert zipfile.is_zipfile(os.path.join(cache_dir, cached))
+
+
+@pytest.mark.parametrize("archive_format", ["zip", "tar.gz"])
+def test_concurrent_clones_share_cache(server, repo, tmp_path, archive_format):
+    archive = _zip() if archive_format == "zip" else _tar_gz()
+    server.routes[f"{ARCHIVE_PATH}.{archive_format}"] = _slow_route(archive)
+    cache_dir = str(tmp_path / "cache")
+    errors = []
+
+    def _clone(index: int) -> None:
+        try:
+            dload.git_clone(
+                repo,
+                str(tmp_path / f"clone{index}") + "/",
+                cache_dir=cache_dir,
+                archive_format=archive_format,
+            )
+        except Exception as error:  # noqa: BLE001
+            errors.append(error)
+
+    threads = [threading.Thread(target=_clone, args=(index,)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    for index in range(8):
+        assert _cloned_file(tmp_path / f"clone{index}") == "hello"
+    assert len(os.listdir(cache_dir)) == 1
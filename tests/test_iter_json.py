@@ -0,0 +1,73 @@
+import json
+import time
+
+import pytest
+
+import dload
+
+
+def test_yields_top_level_array_elements(server):
+    items = [{"i": i, "s": 'x\\"]}{', "n": [1, {"a": None}]} for i in range(500)]
+    items += [1, -2.5e3, "str", True, None]
+    server.add("/arr.json", json.dumps(items).encode())
+
+    assert list(dload.iter_json(server.url + "/arr.json", chunk_size=97)) == items
+
+
+def test_path_skips_siblings(server):
+    document = {
+        "meta": {"skip": [{"}": "]"}] * 100, "n": 5},
+        "data": {"other": "z", "items": [1, 2, 3]},
+    }
+    server.add("/obj.json", json.dumps(document).encode())
+    url = server.url + "/obj.json"
+
+    assert list(dload.iter_json(url, "data.items", chunk_size=13)) == [1, 2, 3]
+    assert list(dload.iter_json(url, "meta.n")) == [5]
+
+
+@pytest.mark.parametrize(
+    "path, error, component",
+    [
+        ("missing", KeyError, "missing"),
+        ("data.typo", KeyError, "data.typo"),
+        ("data.other.items", ValueError, "data.other.items"),
+    ],
+)
+def test_bad_path_raises(server, path, error, component):
+    server.add("/obj.json", b'{"data": {"other": "z", "items": [1]}}')
+    url = server.url + "/obj.json"
+
+    with pytest.raises(error, match=component):
+        list(dload.iter_json(url, path))
+    assert list(dload.iter_json(url, path, raise_on_error=False)) == []
+
+
+def test_scalar_document_is_yielded_once(server):
+    server.add("/num.json", b"42")
+
+    assert list(dload.iter_json(server.url + "/num.json")) == [42]
+
+
+@pytest.mark.parametrize(
+    "body", [b"[1 2 3]", b"[1,]", b"[,1]", b"[1,2,{\"a\":", b"[1x]", b'{"a" 1}']
+)
+def test_malformed_documents_raise(server, body):
+    server.add("/bad.json", body)
+    url = server.url + "/bad.json"
+
+    with pytest.raises(ValueError):
+        list(dload.iter_json(url, "a" if body.startswith(b"{") else ""))
+    assert isinstance(list(dload.iter_json(url, raise_on_error=False)), list)
+
+
+def test_large_element_is_linear(server):
+    element = "x" * (16 * 1024 * 1024)
+    server.add("/large.json", json.dumps([element, 1]).encode())
+
+    start = time.perf_counter()
+    items = list(dload.iter_json(server.url + "/large.json", chunk_size=65536))
+    elapsed = time.perf_counter() - start
+
+    assert items == [element, 1]
+    assert elapsed < 10
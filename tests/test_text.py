@@ -0,0 +1,74 @@
+import codecs
+
+import pytest
+import requests
+
+import dload
+from conftest import send_chunked
+
+
+def test_declared_charset_wins(server):
+    server.add("/t", "café".encode("cp1252"), Content_Type="text/plain; charset=cp1252")
+
+    assert dload.text(server.url + "/t") == "café"
+
+
+def test_explicit_encoding_wins(server):
+    server.add("/t", "café".encode("latin-1"), Content_Type="text/plain; charset=utf-8")
+
+    assert dload.text(server.url + "/t", encoding="latin-1") == "café"
+
+
+@pytest.mark.parametrize(
+    "body, expected",
+    [
+        (codecs.BOM_UTF8 + "héllo".encode("utf-8"), "héllo"),
+        ("héllo".encode("utf-16"), "héllo"),
+        ("héllo wörld".encode("utf-8"), "héllo wörld"),
+    ],
+)
+def test_bom_and_utf8_are_detected_without_charset(server, body, expected):
+    server.add("/t", body, Content_Type="text/plain")
+
+    assert dload.text(server.url + "/t") == expected
+
+
+def test_multibyte_characters_split_across_chunks(server):
+    body = "ü€𝄞" * 5000
+    server.routes["/t"] = lambda handler: send_chunked(handler, body.encode("utf-8"), 7)
+
+    assert dload.text(server.url + "/t", chunk_size=5) == body
+
+
+def test_text_error_returns_empty_string(server):
+    assert dload.text(server.url + "/missing", raise_on_error=False) == ""
+    with pytest.raises(requests.HTTPError):
+        dload.text(server.url + "/missing")
+
+
+def test_iter_lines_handles_crlf_and_missing_final_newline(server):
+    server.routes["/lines"] = lambda handler: send_chunked(
+        handler, b"one\r\ntwo\n\nthree", 3
+    )
+
+    assert list(dload.iter_lines(server.url + "/lines", chunk_size=2)) == [
+        "one",
+        "two",
+        "",
+        "three",
+    ]
+
+
+def test_iter_ndjson_skips_blank_lines(server):
+    server.add("/feed", b'{"a": 1}\r\n\n{"a": 2}\n[3]\n')
+
+    assert list(dload.iter_ndjson(server.url + "/feed")) == [{"a": 1}, {"a": 2}, [3]]
+
+
+def test_iter_ndjson_invalid_line(server):
+    server.add("/feed", b'{"a": 1}\nnot json\n')
+    url = server.url + "/feed"
+
+    with pytest.raises(ValueError):
+        list(dload.iter_ndjson(url))
+    assert list(dload.iter_ndjson(url, raise_on_error=False)) == [{"a": 1}]